@@ -0,0 +1,116 @@
+"""Micro-benchmarks for hubspot_tools.
+
+Run with `python3 benchmarks.py`. No HubSpot token is needed, everything is simulated locally.
+"""
+import csv
+import io
+import json
+import threading
+import time
+
+import hubspot_tools
+
+def make_wide_page(records: int = 100, properties: int = 500) -> bytes:
+    """Build a search response page shaped like HubSpot's, with many properties per record."""
+    results = []
+    for i in range(records):
+        results.append({
+            "id": str(1000 + i),
+            "properties": {f"property_{p}": f"value {i}-{p}" for p in range(properties)},
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-01T00:00:00Z",
+            "archived": False
+        })
+    return json.dumps({"total": records, "results": results}).encode("utf-8")
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def bench_decode(repeat: int = 20):
+    page = make_wide_page()
+    print(f"Decoded page size: {len(page) / 1e6:.2f} MB")
+
+    backend = "orjson" if hubspot_tools.orjson is not None else "json (orjson not installed)"
+    for label, decode in [("json", json.loads), (backend, hubspot_tools.loads_json)]:
+        elapsed = timed(lambda: decode(page), repeat)
+        print(f"Decode with {label}: {len(page) / elapsed / 1e6:.1f} MB/s")
+
+def bench_write(repeat: int = 20):
+    records = hubspot_tools.loads_json(make_wide_page())['results']
+    fieldnames = ['Record ID'] + sorted(records[0]['properties'])
+
+    def dict_writer():
+        writer = csv.DictWriter(io.StringIO(), fieldnames=fieldnames)
+        writer.writeheader()
+        for record in records:
+            row = {'Record ID': record['id']}
+            row.update(record['properties'])
+            writer.writerow(row)
+
+    def list_writer():
+        writer = csv.writer(io.StringIO())
+        writer.writerow(fieldnames)
+        writer.writerows(hubspot_tools.iter_csv_rows(records, fieldnames, 'Record ID'))
+
+    for label, write in [("csv.DictWriter", dict_writer), ("iter_csv_rows", list_writer)]:
+        elapsed = timed(write, repeat)
+        print(f"Write with {label}: {len(records) / elapsed:,.0f} rows/s")
+
+def bench_aimd(capacity: int = 8, service_time: float = 0.02, duration: float = 5.0, workers: int = 32):
+    """Drive an AIMDController against a mock portal that answers 429 above `capacity` in-flight requests."""
+    controller = hubspot_tools.AIMDController(maximum=workers)
+    lock = threading.Lock()
+    state = {'active': 0, 'ok': 0, 'throttled': 0}
+    limits = []
+    deadline = time.monotonic() + duration
+
+    def client():
+        while time.monotonic() < deadline:
+            controller.acquire()
+            started = time.monotonic()
+            with lock:
+                state['active'] += 1
+                throttled = state['active'] > capacity
+            time.sleep(service_time / 10 if throttled else service_time)
+            with lock:
+                state['active'] -= 1
+                state['throttled' if throttled else 'ok'] += 1
+            controller.release(started, throttled)
+
+    threads = [threading.Thread(target=client) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    while time.monotonic() < deadline:
+        limits.append(controller.current_limit())
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+
+    settled = limits[len(limits) // 2:]
+    sustainable = capacity / service_time
+    print(f"AIMD mock: capacity {capacity} in flight, {sustainable:.0f} req/s sustainable")
+    print(f"AIMD limit over the second half: min {min(settled)}, avg {sum(settled) / len(settled):.1f}, max {max(settled)}")
+    print(f"AIMD throughput: {state['ok'] / duration:.0f} req/s ({state['ok'] / duration / sustainable:.0%} of sustainable), "
+          f"{state['throttled']} requests throttled")
+
+def check_aimd_latency_shift():
+    """Healthy calls that are slower than the first ones must not keep the limit at its minimum."""
+    controller = hubspot_tools.AIMDController()
+    for latency in [0.005] * 3 + [0.02] * 100:
+        controller.acquire()
+        started = time.monotonic()
+        time.sleep(latency)
+        controller.release(started, False)
+    metrics = controller.snapshot()
+    print(f"AIMD after 3 x 5 ms then 100 x 20 ms calls: {metrics}")
+    assert metrics['decreases'] <= 3, metrics
+    assert metrics['limit'] >= controller.maximum // 2, metrics
+
+if __name__ == "__main__":
+    check_aimd_latency_shift()
+    bench_decode()
+    bench_write()
+    bench_aimd()
@@ -4,15 +4,24 @@ import os
 import glob
 import time
 import json
+import hashlib
 from dotenv import load_dotenv
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from termcolor import colored
 import sys
 import random
+import threading
 from tqdm import tqdm
 import logging
 from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard json module
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -45,21 +54,215 @@ TOKEN = os.getenv("HUBSPOT_TOKEN")
 BASE_URL = "https://api.hubapi.com"
 BATCH_SIZE = 100
 
+# HubSpot rate limits apply per portal (private apps: 100 requests every 10 seconds)
+RATE_LIMIT_REQUESTS = 100
+RATE_LIMIT_WINDOW = 10
+MAX_RETRIES = 3
+
+# Adaptive concurrency: in-flight requests per portal grow by one per healthy round trip
+# and cut by 30% on 429s, server errors or when latency exceeds LATENCY_SPIKE_FACTOR x average
+MAX_CONCURRENCY = 16
+INITIAL_CONCURRENCY = 2
+LATENCY_SPIKE_FACTOR = 3
+POOL_SIZE = MAX_CONCURRENCY
+
+# Additional portals are configured as HUBSPOT_TOKEN_<NAME>=... in the .env file
+PORTAL_TOKEN_PREFIX = "HUBSPOT_TOKEN_"
+
+class RateLimiter:
+    """Sliding window limiter shared by every request sent to one portal."""
+
+    def __init__(self, max_requests: int = RATE_LIMIT_REQUESTS, window: float = RATE_LIMIT_WINDOW):
+        self.max_requests = max_requests
+        self.window = window
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= self.window:
+                    self.calls.popleft()
+                if len(self.calls) < self.max_requests:
+                    self.calls.append(now)
+                    return
+                delay = self.window - (now - self.calls[0])
+            time.sleep(delay)
+
+class AIMDController:
+    """Additive increase / multiplicative decrease limit on the requests in flight to one portal."""
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, minimum: int = 1, maximum: int = MAX_CONCURRENCY,
+                 decrease_factor: float = 0.7):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.latency = None
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.decreases = 0
+        self.condition = threading.Condition()
+
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def acquire(self):
+        """Wait for a free slot. Callers time the request themselves, once it is really sent."""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, started: float, congested: bool):
+        """Free the slot; `started` is the time.monotonic() at which the request was sent."""
+        now = time.monotonic()
+        latency = now - started
+        with self.condition:
+            self.in_flight -= 1
+            self.requests += 1
+            spike = self.latency is not None and latency > self.latency * LATENCY_SPIKE_FACTOR
+            if not congested:
+                # Spikes feed the average too, so it follows endpoints that are simply slower
+                self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+            if congested or spike:
+                self.throttled += int(congested)
+                # Requests started before the last cut were already sent at the old limit
+                if started > self.last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self.last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def snapshot(self) -> Dict:
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'decreases': self.decreases,
+                'avg_latency_ms': round((self.latency or 0) * 1000)
+            }
+
+class Portal:
+    """A HubSpot portal with its own token, connection pool and rate limit budget."""
+
+    def __init__(self, name: Optional[str], token: Optional[str]):
+        self.name = name
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = RateLimiter()
+        self.concurrency = AIMDController()
+        # The default portal keeps writing to extract/, named portals get their own sub-folder
+        self.extract_dir = "extract" if name is None else os.path.join("extract", name)
+
+_default_portal = None
+_portal_context = threading.local()
+
+def get_current_portal() -> Portal:
+    """Return the portal bound to the current thread, or the HUBSPOT_TOKEN portal."""
+    global _default_portal
+    portal = getattr(_portal_context, 'portal', None)
+    if portal is not None:
+        return portal
+    if _default_portal is None:
+        _default_portal = Portal(None, TOKEN)
+    return _default_portal
+
+def get_extract_dir() -> str:
+    return get_current_portal().extract_dir
+
+def api_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request to the current portal, respecting its rate limit and retrying on 429."""
+    portal = get_current_portal()
+    for attempt in range(MAX_RETRIES + 1):
+        portal.concurrency.acquire()
+        # Take the rate limit slot right before sending, and time the request from there
+        portal.rate_limiter.wait()
+        started = time.monotonic()
+        response = None
+        try:
+            response = portal.session.request(method, url, **kwargs)
+        finally:
+            congested = response is None or response.status_code == 429 or response.status_code >= 500
+            portal.concurrency.release(started, congested)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            return response
+        delay = float(response.headers.get('Retry-After', 1))
+        logger.warning(f"Rate limited by HubSpot, retrying in {delay}s (Attempt {attempt + 1}/{MAX_RETRIES})")
+        time.sleep(delay)
+    return response
+
+def run_concurrently(func, items: List):
+    """Call func on every item from worker threads bound to the current portal.
+
+    Results are yielded in input order. The portal's AIMDController decides how many
+    requests are really in flight, the pool only needs to be large enough for its maximum.
+    """
+    portal = get_current_portal()
+
+    def worker(item):
+        _portal_context.portal = portal
+        try:
+            return func(item)
+        finally:
+            _portal_context.portal = None
+
+    with ThreadPoolExecutor(max_workers=portal.concurrency.maximum) as executor:
+        yield from executor.map(worker, items)
+
+def loads_json(content: bytes):
+    """Decode a JSON payload with orjson when installed, the json module otherwise."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def decode_json(response: requests.Response):
+    try:
+        return loads_json(response.content)
+    except ValueError:
+        # Let requests raise its own JSONDecodeError, which callers already handle
+        return response.json()
+
+def iter_csv_rows(records: List[Dict], fieldnames: List[str], id_column: str):
+    """Yield each record as a list in fieldnames order, without building an intermediate dict."""
+    id_index = fieldnames.index(id_column)
+    property_names = fieldnames[:id_index] + fieldnames[id_index + 1:]
+    for record in records:
+        properties = record['properties']
+        row = [properties.get(name) for name in property_names]
+        row.insert(id_index, record['id'])
+        yield row
+
+def load_portal_tokens() -> Dict[str, str]:
+    """Read the named portal tokens (HUBSPOT_TOKEN_<NAME>) from the environment."""
+    return {
+        key[len(PORTAL_TOKEN_PREFIX):].lower(): value
+        for key, value in sorted(os.environ.items())
+        if key.startswith(PORTAL_TOKEN_PREFIX) and value
+    }
+
 def get_delete_url(object_type: str) -> str:
     return f"{BASE_URL}/crm/v3/objects/{object_type}/batch/archive"
 
 def get_hubspot_objects() -> Optional[List[str]]:
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
-    
     # Liste des objets standard connus
     standard_objects = ['contacts', 'companies', 'deals', 'tickets', 'products', 'line_items', 'quotes']
     
     # Get custom objects
     custom_url = f"{BASE_URL}/crm/v3/schemas"
     try:
-        custom_response = requests.get(custom_url, headers=headers)
+        custom_response = api_request('GET', custom_url)
         custom_response.raise_for_status()
-        custom_objects = [obj['name'] for obj in custom_response.json().get('results', [])]
+        custom_objects = [obj['name'] for obj in decode_json(custom_response).get('results', [])]
         return standard_objects + custom_objects
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching custom objects from HubSpot: {str(e)}")
@@ -75,12 +278,11 @@ def get_user_input(prompt: str, options: Optional[List[str]] = None) -> str:
         print(colored("Invalid input. Please try again.", "red"))
 
 def get_object_fields(object_name: str) -> Optional[Dict]:
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
     url = f"{BASE_URL}/crm/v3/properties/{object_name}"
     try:
-        response = requests.get(url, headers=headers)
+        response = api_request('GET', url)
         response.raise_for_status()
-        return response.json()
+        return decode_json(response)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching fields for {object_name}: {str(e)}")
         return None
@@ -101,6 +303,213 @@ def extract_fields_to_csv(object_name: str, fields: Dict, output_file: str):
                 'Field Type': field_type
             })
 
+# Attributes compared between two snapshots of the same property, every hashed attribute is listed
+# so that a new snapshot always has at least one difference to report
+SNAPSHOT_DIFF_ATTRIBUTES = ['label', 'type', 'fieldType']
+
+def get_snapshot_dir() -> str:
+    return os.path.join(get_extract_dir(), "snapshots")
+
+def get_property_definitions(fields: Dict) -> List[Dict]:
+    """Keep the attributes that describe the schema, sorted by name so the hash is stable."""
+    definitions = [
+        {'name': field['name'], 'label': field.get('label', field['name']),
+         'type': field['type'], 'fieldType': field.get('fieldType', 'N/A')}
+        for field in fields['results']
+    ]
+    return sorted(definitions, key=lambda definition: definition['name'])
+
+def hash_property_definitions(definitions: List[Dict]) -> str:
+    canonical = json.dumps(definitions, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def load_snapshot_index(snapshot_dir: str) -> Dict:
+    """Return {object: {'hash': ..., 'file': ...}} for the latest snapshot of each object."""
+    index_file = os.path.join(snapshot_dir, "index.json")
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, 'rb') as f:
+        return loads_json(f.read())
+
+def save_snapshot_index(snapshot_dir: str, index: Dict):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, "index.json"), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+
+def load_snapshot(snapshot_file: str) -> Dict:
+    with open(snapshot_file, 'rb') as f:
+        return loads_json(f.read())
+
+def list_snapshots(snapshot_dir: str, object_name: str) -> List[str]:
+    """Snapshot files of an object, oldest first (file names start with a timestamp)."""
+    return sorted(glob.glob(os.path.join(snapshot_dir, object_name, "*.json")))
+
+def save_field_snapshot(object_name: str, fields: Dict, index: Dict) -> bool:
+    """Store a content-hashed snapshot of the object's properties, return False if nothing changed."""
+    definitions = get_property_definitions(fields)
+    digest = hash_property_definitions(definitions)
+    if index.get(object_name, {}).get('hash') == digest:
+        return False
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    object_dir = os.path.join(get_snapshot_dir(), object_name)
+    os.makedirs(object_dir, exist_ok=True)
+    snapshot_file = os.path.join(object_dir, f"{timestamp}_{digest[:12]}.json")
+    with open(snapshot_file, 'w', encoding='utf-8') as f:
+        json.dump({'object': object_name, 'hash': digest, 'created_at': timestamp, 'properties': definitions}, f)
+
+    index[object_name] = {'hash': digest, 'file': os.path.relpath(snapshot_file, get_snapshot_dir())}
+    return True
+
+def save_object_fields(object_name: str, fields: Dict, index: Dict) -> Tuple[bool, str]:
+    """Snapshot the fields and only rewrite the CSV file when they changed since the last run."""
+    output_file = f'{get_extract_dir()}/{object_name}_fields.csv'
+    changed = save_field_snapshot(object_name, fields, index)
+    if changed or not os.path.exists(output_file):
+        extract_fields_to_csv(object_name, fields, output_file)
+    return changed, output_file
+
+def diff_snapshots(old: Dict, new: Dict) -> Dict[str, List]:
+    """Compare two snapshots of the same object.
+
+    Returns the added and removed property names, and (name, attribute, old value, new value)
+    for every property whose label, type or fieldType changed.
+    """
+    old_properties = {definition['name']: definition for definition in old['properties']}
+    new_properties = {definition['name']: definition for definition in new['properties']}
+    changed = []
+    if old['hash'] != new['hash']:
+        for name in sorted(old_properties.keys() & new_properties.keys()):
+            for attribute in SNAPSHOT_DIFF_ATTRIBUTES:
+                old_value = old_properties[name].get(attribute)
+                new_value = new_properties[name].get(attribute)
+                if old_value != new_value:
+                    changed.append((name, attribute, old_value, new_value))
+    return {
+        'added': sorted(new_properties.keys() - old_properties.keys()),
+        'removed': sorted(old_properties.keys() - new_properties.keys()),
+        'changed': changed
+    }
+
+def write_diff_to_csv(diffs: Dict[str, Dict[str, List]], output_file: str) -> int:
+    rows = []
+    for object_name, diff in diffs.items():
+        rows.extend([object_name, name, 'added', '', '', ''] for name in diff['added'])
+        rows.extend([object_name, name, 'removed', '', '', ''] for name in diff['removed'])
+        rows.extend([object_name, name, 'changed', attribute, old_value, new_value]
+                    for name, attribute, old_value, new_value in diff['changed'])
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Object', 'API Name', 'Change', 'Attribute', 'Old Value', 'New Value'])
+        writer.writerows(rows)
+    return len(rows)
+
+def get_snapshot_portals() -> Dict[str, str]:
+    """Snapshot folders found under extract/, keyed by portal name ('default' for HUBSPOT_TOKEN)."""
+    portals = {}
+    if os.path.isdir(os.path.join("extract", "snapshots")):
+        portals['default'] = os.path.join("extract", "snapshots")
+    for snapshot_dir in sorted(glob.glob(os.path.join("extract", "*", "snapshots"))):
+        portals[os.path.basename(os.path.dirname(snapshot_dir))] = snapshot_dir
+    return portals
+
+def compare_object_snapshots():
+    portals = get_snapshot_portals()
+    if not portals:
+        logger.error("No field snapshots found. Extract fields first.")
+        return
+
+    names = list(portals)
+    if len(names) == 1:
+        portal_name = names[0]
+    else:
+        print(colored("Portals with field snapshots:", "yellow"))
+        for i, name in enumerate(names, 1):
+            print(colored(f"{i}. {name}", "cyan"))
+        portal_choice = get_user_input("Enter the number of the portal:", [str(i) for i in range(1, len(names) + 1)])
+        if portal_choice == 'back':
+            return
+        portal_name = names[int(portal_choice) - 1]
+
+    snapshot_dir = portals[portal_name]
+    objects = sorted(load_snapshot_index(snapshot_dir))
+    if not objects:
+        logger.error("No field snapshots found. Extract fields first.")
+        return
+
+    print(colored("Objects with field snapshots:", "yellow"))
+    for i, obj in enumerate(objects, 1):
+        print(colored(f"{i}. {obj}", "cyan"))
+    selection = get_user_input("Enter the number of the object to compare:", [str(i) for i in range(1, len(objects) + 1)])
+    if selection == 'back':
+        return
+    selected_object = objects[int(selection) - 1]
+
+    snapshots = list_snapshots(snapshot_dir, selected_object)
+    if len(snapshots) < 2:
+        print(colored(f"Only one snapshot exists for {selected_object}, nothing to compare.", "yellow"))
+        return
+
+    print(colored("Available snapshots:", "yellow"))
+    for i, snapshot_file in enumerate(snapshots, 1):
+        print(colored(f"{i}. {os.path.basename(snapshot_file)}", "cyan"))
+    options = [str(i) for i in range(1, len(snapshots) + 1)]
+    old_choice = get_user_input("Enter the number of the old snapshot:", options)
+    if old_choice == 'back':
+        return
+    new_choice = get_user_input("Enter the number of the new snapshot:", options)
+    if new_choice == 'back':
+        return
+
+    old = load_snapshot(snapshots[int(old_choice) - 1])
+    new = load_snapshot(snapshots[int(new_choice) - 1])
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Next to the portal's own extracts: extract/ or extract/<portal>/
+    output_file = f'{os.path.dirname(snapshot_dir)}/{selected_object}_fields_diff_{timestamp}.csv'
+    changes = write_diff_to_csv({selected_object: diff_snapshots(old, new)}, output_file)
+    print(colored(f"{changes} differences for {selected_object} saved in {output_file}", "green"))
+
+def compare_portal_snapshots():
+    portals = get_snapshot_portals()
+    if len(portals) < 2:
+        logger.error("Field snapshots are needed for at least two portals. Extract fields on each portal first.")
+        return
+
+    names = list(portals)
+    print(colored("Portals with field snapshots:", "yellow"))
+    for i, name in enumerate(names, 1):
+        print(colored(f"{i}. {name}", "cyan"))
+    options = [str(i) for i in range(1, len(names) + 1)]
+    old_choice = get_user_input("Enter the number of the reference portal:", options)
+    if old_choice == 'back':
+        return
+    new_choice = get_user_input("Enter the number of the portal to compare:", options)
+    if new_choice == 'back':
+        return
+
+    old_name, new_name = names[int(old_choice) - 1], names[int(new_choice) - 1]
+    old_dir, new_dir = portals[old_name], portals[new_name]
+    old_index, new_index = load_snapshot_index(old_dir), load_snapshot_index(new_dir)
+
+    # An object missing from one portal is compared with an empty snapshot,
+    # so all of its properties are reported as added or removed
+    empty_snapshot = {'hash': '', 'properties': []}
+    diffs = {}
+    for obj in sorted(old_index.keys() | new_index.keys()):
+        if obj in old_index and obj in new_index and old_index[obj]['hash'] == new_index[obj]['hash']:
+            continue
+        if obj not in old_index or obj not in new_index:
+            logger.warning(f"{obj} only has snapshots in {old_name if obj in old_index else new_name}")
+        old = load_snapshot(os.path.join(old_dir, old_index[obj]['file'])) if obj in old_index else empty_snapshot
+        new = load_snapshot(os.path.join(new_dir, new_index[obj]['file'])) if obj in new_index else empty_snapshot
+        diffs[obj] = diff_snapshots(old, new)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join("extract", f"fields_diff_{old_name}_{new_name}_{timestamp}.csv")
+    changes = write_diff_to_csv(diffs, output_file)
+    print(colored(f"{changes} differences across {len(diffs)} objects saved in {output_file}", "green"))
+
 def list_objects_and_fields():
     objects = get_hubspot_objects()
     if not objects:
@@ -119,39 +528,45 @@ def list_objects_and_fields():
     if not fields:
         return
 
-    output_file = f'extract/{selected_object}_fields.csv'
-    extract_fields_to_csv(selected_object, fields, output_file)
+    index = load_snapshot_index(get_snapshot_dir())
+    _, output_file = save_object_fields(selected_object, fields, index)
+    save_snapshot_index(get_snapshot_dir(), index)
 
     print(colored(f"Fields for {selected_object} saved in {output_file}", "green"))
 
-def extract_all_objects_fields():
+def extract_all_objects_fields() -> Optional[int]:
     objects = get_hubspot_objects()
     if not objects:
-        return
+        return None
 
-    for obj in tqdm(objects, desc="Extracting fields for all objects"):
-        fields = get_object_fields(obj)
-        if not fields:
-            logger.warning(f"Skipping {obj} due to error fetching fields")
-            continue
+    extracted = 0
+    unchanged = 0
+    index = load_snapshot_index(get_snapshot_dir())
+    controller = get_current_portal().concurrency
+    with tqdm(total=len(objects), desc="Extracting fields for all objects") as pbar:
+        for obj, fields in zip(objects, run_concurrently(get_object_fields, objects)):
+            pbar.update(1)
+            pbar.set_postfix(concurrency=controller.current_limit())
+            if not fields:
+                logger.warning(f"Skipping {obj} due to error fetching fields")
+                continue
 
-        output_file = f'extract/{obj}_fields.csv'
-        extract_fields_to_csv(obj, fields, output_file)
+            changed, _ = save_object_fields(obj, fields, index)
+            unchanged += int(not changed)
+            extracted += 1
+    save_snapshot_index(get_snapshot_dir(), index)
 
-    print(colored("Fields for all objects saved in the 'extract' folder", "green"))
+    print(colored(f"Fields for all objects saved in the '{get_extract_dir()}' folder ({unchanged} unchanged since last snapshot)", "green"))
+    return extracted
 
 def delete_records_batch(object_type: str, record_ids: List[str]) -> Tuple[bool, int, str]:
     """Delete a batch of records from HubSpot."""
-    headers = {
-        'Authorization': f'Bearer {TOKEN}',
-        'Content-Type': 'application/json'
-    }
     payload = {
         "inputs": [{"id": id} for id in record_ids]
     }
     url = get_delete_url(object_type)
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = api_request('POST', url, json=payload)
         response.raise_for_status()
         return True, response.status_code, response.text
     except requests.exceptions.RequestException as e:
@@ -178,38 +593,58 @@ def get_object_type_from_filename(filename: str) -> str:
     }
     return object_types.get(base_name, base_name)
 
-def delete_records():
-    delete_folder = "delete"
-    if not os.path.exists(delete_folder):
-        logger.error(f"The '{delete_folder}' folder does not exist.")
-        return
+def select_csv_file(folder: str, purpose: str) -> Optional[str]:
+    if not os.path.exists(folder):
+        logger.error(f"The '{folder}' folder does not exist.")
+        return None
 
-    csv_files = glob.glob(os.path.join(delete_folder, "*.csv"))
+    csv_files = glob.glob(os.path.join(folder, "*.csv"))
     if not csv_files:
-        logger.error(f"No CSV files found in the '{delete_folder}' folder.")
-        return
+        logger.error(f"No CSV files found in the '{folder}' folder.")
+        return None
 
-    print(colored("Available CSV files for deletion:", "yellow"))
+    print(colored(f"Available CSV files for {purpose}:", "yellow"))
     for i, file in enumerate(csv_files, 1):
         print(colored(f"{i}. {os.path.basename(file)}", "cyan"))
 
     selection = get_user_input("Enter the number of the file to process:", [str(i) for i in range(1, len(csv_files) + 1)])
     if selection == 'back':
+        return None
+
+    return csv_files[int(selection) - 1]
+
+def read_record_ids(csv_file: str) -> Optional[List[str]]:
+    """Read the 'Record ID' column (any case) of a CSV file, keeping the file order."""
+    with open(csv_file, 'r') as csvfile:
+        reader = csv.DictReader(csvfile)
+        if not reader.fieldnames:
+            return []
+        record_id_key = next((k for k in reader.fieldnames if k.lower() == 'record id'), None)
+        if not record_id_key:
+            logger.error("'Record ID' column not found in the CSV.")
+            return None
+        return [row[record_id_key] for row in reader]
+
+def write_errors_to_csv(errors: List[Dict], prefix: str):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    error_file = os.path.join("errors", f"{prefix}_errors_{timestamp}.csv")
+    with open(error_file, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ['Batch', 'Status Code', 'Error Message']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for error in errors:
+            writer.writerow(error)
+    print(colored(f"Errors have been recorded in the file '{error_file}'.", "yellow"))
+
+def delete_records():
+    selected_file = select_csv_file("delete", "deletion")
+    if not selected_file:
         return
 
-    selected_file = csv_files[int(selection) - 1]
     object_type = get_object_type_from_filename(os.path.basename(selected_file))
-    
-    record_ids = []
-    with open(selected_file, 'r') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            record_id_key = next((k for k in row.keys() if k.lower() == 'record id'), None)
-            if record_id_key:
-                record_ids.append(row[record_id_key])
-            else:
-                logger.error("'Record ID' column not found in the CSV.")
-                return
+    record_ids = read_record_ids(selected_file)
+    if record_ids is None:
+        return
 
     total_records = len(record_ids)
     print(colored(f"Number of records to delete: {total_records}", "yellow"))
@@ -222,10 +657,12 @@ def delete_records():
     success_count = 0
     errors = []
 
+    batches = [record_ids[i:i+BATCH_SIZE] for i in range(0, total_records, BATCH_SIZE)]
+    results = run_concurrently(lambda batch: delete_records_batch(object_type, batch), batches)
+    controller = get_current_portal().concurrency
+
     with tqdm(total=total_records, desc=f"Deleting {object_type}") as pbar:
-        for i in range(0, total_records, BATCH_SIZE):
-            batch = record_ids[i:i+BATCH_SIZE]
-            success, status_code, response_text = delete_records_batch(object_type, batch)
+        for i, batch, (success, status_code, response_text) in zip(range(0, total_records, BATCH_SIZE), batches, results):
             if success:
                 success_count += len(batch)
             else:
@@ -235,22 +672,90 @@ def delete_records():
                     'Error Message': response_text
                 })
             pbar.update(len(batch))
+            pbar.set_postfix(concurrency=controller.current_limit())
 
     print(colored(f"\nOperation completed. {success_count}/{total_records} {object_type} successfully deleted.", "green"))
+    logger.info(f"Concurrency metrics: {controller.snapshot()}")
 
     if errors:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        error_file = os.path.join("errors", f"deletion_errors_{timestamp}.csv")
-        with open(error_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Batch', 'Status Code', 'Error Message']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for error in errors:
-                writer.writerow(error)
-        print(colored(f"Errors have been recorded in the file '{error_file}'.", "yellow"))
+        write_errors_to_csv(errors, "deletion")
+
+def read_records_batch(object_type: str, record_ids: List[str], properties: List[str]) -> Tuple[Optional[List[Dict]], int, str]:
+    """Read the given properties for up to BATCH_SIZE records in a single call."""
+    payload = {
+        "properties": properties,
+        "inputs": [{"id": id} for id in record_ids]
+    }
+    url = f"{BASE_URL}/crm/v3/objects/{object_type}/batch/read"
+    try:
+        response = api_request('POST', url, json=payload)
+        response.raise_for_status()
+        # 207 Multi-Status: the records that were found are still returned
+        return decode_json(response).get('results', []), response.status_code, ''
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error reading records: {str(e)}")
+        return None, getattr(e.response, 'status_code', 0), str(e)
+
+def hydrate_records():
+    selected_file = select_csv_file("hydrate", "hydration")
+    if not selected_file:
+        return
+
+    object_type = get_object_type_from_filename(os.path.basename(selected_file))
+    record_ids = read_record_ids(selected_file)
+    if not record_ids:
+        logger.error("No record IDs to hydrate.")
+        return
+
+    properties_input = get_user_input(f"Enter the {object_type} properties to fetch, separated by commas:")
+    if properties_input == 'back':
+        return
+    properties = list(dict.fromkeys(name.strip() for name in properties_input.split(',') if name.strip()))
+    if not properties:
+        logger.error("No properties given.")
+        return
+
+    total_records = len(record_ids)
+    print(colored(f"Fetching {len(properties)} properties for {total_records} {object_type}...", "yellow"))
+
+    batches = [record_ids[i:i+BATCH_SIZE] for i in range(0, total_records, BATCH_SIZE)]
+    results = run_concurrently(lambda batch: read_records_batch(object_type, batch, properties), batches)
+    controller = get_current_portal().concurrency
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = f'{get_extract_dir()}/{object_type}_hydrated_{timestamp}.csv'
+    fieldnames = ['Record ID'] + properties
+    found_count = 0
+    errors = []
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile, \
+            tqdm(total=total_records, desc=f"Hydrating {object_type}") as pbar:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        # Batches come back in input order; rows are written as soon as their batch is ready
+        for i, batch, (records, status_code, response_text) in zip(range(0, total_records, BATCH_SIZE), batches, results):
+            if records is None:
+                errors.append({
+                    'Batch': f"{i}-{i+len(batch)}",
+                    'Status Code': status_code,
+                    'Error Message': response_text
+                })
+                records = []
+            records_by_id = {record['id']: record for record in records}
+            found_count += sum(1 for record_id in batch if record_id in records_by_id)
+            # IDs that were not found keep their line, with empty properties
+            ordered = [records_by_id.get(record_id, {'id': record_id, 'properties': {}}) for record_id in batch]
+            writer.writerows(iter_csv_rows(ordered, fieldnames, 'Record ID'))
+            pbar.update(len(batch))
+            pbar.set_postfix(concurrency=controller.current_limit())
+
+    print(colored(f"\nOperation completed. {found_count}/{total_records} {object_type} found and saved in {output_file}", "green"))
+    logger.info(f"Concurrency metrics: {controller.snapshot()}")
+
+    if errors:
+        write_errors_to_csv(errors, "hydration")
 
 def get_sample_data(object_type: str, sample_type: str = 'recent') -> Optional[List[Dict]]:
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
     url = f"{BASE_URL}/crm/v3/objects/{object_type}/search"
     
     properties = get_all_properties(object_type)
@@ -269,9 +774,9 @@ def get_sample_data(object_type: str, sample_type: str = 'recent') -> Optional[L
     }
     
     try:
-        response = requests.post(url, headers=headers, json=body)
+        response = api_request('POST', url, json=body)
         response.raise_for_status()
-        results = response.json().get('results', [])
+        results = decode_json(response).get('results', [])
         
         if sample_type == 'random':
             random.shuffle(results)
@@ -282,16 +787,41 @@ def get_sample_data(object_type: str, sample_type: str = 'recent') -> Optional[L
         return None
 
 def get_all_properties(object_type: str) -> Optional[List[str]]:
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
     url = f"{BASE_URL}/crm/v3/properties/{object_type}"
     try:
-        response = requests.get(url, headers=headers)
+        response = api_request('GET', url)
         response.raise_for_status()
-        return [prop['name'] for prop in response.json()['results']]
+        return [prop['name'] for prop in decode_json(response)['results']]
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching properties for {object_type}: {str(e)}")
         return None
 
+def select_sample_type() -> Optional[str]:
+    print(colored("Select sample type:", "yellow"))
+    print(colored("1. Recent (last 100 records)", "cyan"))
+    print(colored("2. Random (100 random records)", "cyan"))
+
+    sample_choice = get_user_input("Enter your choice:", ['1', '2'])
+    if sample_choice == 'back':
+        return None
+
+    return 'recent' if sample_choice == '1' else 'random'
+
+def write_sample_to_csv(sample_data: List[Dict], output_file: str, desc: str) -> int:
+    all_fields = set(['Record ID'])
+    for record in sample_data:
+        all_fields.update(record['properties'].keys())
+
+    fieldnames = ['Record ID'] + sorted(list(all_fields - {'Record ID'}))
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        records = tqdm(sample_data, desc=desc, total=len(sample_data))
+        writer.writerows(iter_csv_rows(records, fieldnames, 'Record ID'))
+
+    return len(fieldnames)
+
 def extract_sample_data(selected_object=None):
     if not selected_object:
         objects = get_hubspot_objects()
@@ -308,16 +838,10 @@ def extract_sample_data(selected_object=None):
 
         selected_object = objects[int(selection) - 1]
 
-    print(colored("Select sample type:", "yellow"))
-    print(colored("1. Recent (last 100 records)", "cyan"))
-    print(colored("2. Random (100 random records)", "cyan"))
-
-    sample_choice = get_user_input("Enter your choice:", ['1', '2'])
-    if sample_choice == 'back':
+    sample_type = select_sample_type()
+    if sample_type is None:
         return
 
-    sample_type = 'recent' if sample_choice == '1' else 'random'
-    
     print(colored(f"Fetching {sample_type} sample data for {selected_object}...", "yellow"))
     sample_data = get_sample_data(selected_object, sample_type)
 
@@ -326,80 +850,60 @@ def extract_sample_data(selected_object=None):
         return
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = f'extract/{selected_object}_sample_{sample_type}_{timestamp}.csv'
-
-    all_fields = set(['Record ID'])
-    for record in sample_data:
-        all_fields.update(record['properties'].keys())
-
-    fieldnames = ['Record ID'] + sorted(list(all_fields - {'Record ID'}))
-
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for record in tqdm(sample_data, desc="Writing data to CSV", total=len(sample_data)):
-            row = {'Record ID': record['id']}
-            row.update(record['properties'])
-            writer.writerow(row)
+    output_file = f'{get_extract_dir()}/{selected_object}_sample_{sample_type}_{timestamp}.csv'
+    column_count = write_sample_to_csv(sample_data, output_file, "Writing data to CSV")
 
     print(colored(f"Sample data for {selected_object} saved in {output_file}", "green"))
-    print(colored(f"Total number of columns: {len(fieldnames)}", "yellow"))
+    print(colored(f"Total number of columns: {column_count}", "yellow"))
 
-def extract_sample_data_all_objects():
+def extract_sample_data_all_objects(sample_type: Optional[str] = None) -> Optional[int]:
     objects = get_hubspot_objects()
     if not objects:
-        return
-
-    print(colored("Select sample type:", "yellow"))
-    print(colored("1. Recent (last 100 records)", "cyan"))
-    print(colored("2. Random (100 random records)", "cyan"))
-
-    sample_choice = get_user_input("Enter your choice:", ['1', '2'])
-    if sample_choice == 'back':
-        return
+        return None
 
-    sample_type = 'recent' if sample_choice == '1' else 'random'
+    if sample_type is None:
+        sample_type = select_sample_type()
+        if sample_type is None:
+            return 0
 
-    for obj in objects:
-        print(colored(f"\nExtracting {sample_type} sample data for {obj}...", "yellow"))
+    def fetch_sample(obj):
         try:
-            sample_data = get_sample_data(obj, sample_type)
-
-            if not sample_data:
-                logger.warning(f"No data found for {obj}")
-                continue
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f'extract/{obj}_sample_{sample_type}_{timestamp}.csv'
-
-            all_fields = set(['Record ID'])
-            for record in sample_data:
-                all_fields.update(record['properties'].keys())
-
-            fieldnames = ['Record ID'] + sorted(list(all_fields - {'Record ID'}))
-
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for record in tqdm(sample_data, desc=f"Writing data for {obj}", total=len(sample_data)):
-                    row = {'Record ID': record['id']}
-                    row.update(record['properties'])
-                    writer.writerow(row)
-
-            print(colored(f"Sample data for {obj} saved in {output_file}", "green"))
-            print(colored(f"Total number of columns: {len(fieldnames)}", "yellow"))
+            return get_sample_data(obj, sample_type)
         except Exception as e:
-            logger.error(f"Error processing {obj}: {str(e)}")
-            continue
+            logger.error(f"Error fetching sample data for {obj}: {str(e)}")
+            return None
+
+    print(colored(f"\nExtracting {sample_type} sample data for {len(objects)} objects...", "yellow"))
+    extracted = 0
+    controller = get_current_portal().concurrency
+    with tqdm(total=len(objects), desc=f"Extracting {sample_type} sample data") as pbar:
+        for obj, sample_data in zip(objects, run_concurrently(fetch_sample, objects)):
+            pbar.update(1)
+            pbar.set_postfix(concurrency=controller.current_limit())
+            try:
+                if not sample_data:
+                    logger.warning(f"No data found for {obj}")
+                    continue
+
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                output_file = f'{get_extract_dir()}/{obj}_sample_{sample_type}_{timestamp}.csv'
+                column_count = write_sample_to_csv(sample_data, output_file, f"Writing data for {obj}")
+
+                # tqdm.write keeps the progress bar at the bottom of the terminal
+                tqdm.write(colored(f"Sample data for {obj} saved in {output_file}", "green"))
+                tqdm.write(colored(f"Total number of columns: {column_count}", "yellow"))
+                extracted += 1
+            except Exception as e:
+                logger.error(f"Error processing {obj}: {str(e)}")
+                continue
 
     print(colored("Extraction of sample data for all objects completed.", "green"))
+    logger.info(f"Concurrency metrics: {controller.snapshot()}")
+    return extracted
 
-def extract_contacts_without_company():
+def extract_contacts_without_company() -> Optional[int]:
     print(colored("Estimating total number of contacts without company...", "yellow"))
     
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
     url = f"{BASE_URL}/crm/v3/objects/contacts/search"
     
     properties = ["firstname", "lastname", "email", "phone"]
@@ -420,21 +924,21 @@ def extract_contacts_without_company():
     }
     
     try:
-        response = requests.post(url, headers=headers, json=initial_body)
+        response = api_request('POST', url, json=initial_body)
         response.raise_for_status()
-        data = response.json()
+        data = decode_json(response)
         total_contacts = data.get('total', 0)
         print(colored(f"Estimated total contacts without company: {total_contacts}", "green"))
     except requests.exceptions.RequestException as e:
         logger.error(f"Error estimating total contacts: {str(e)}")
-        total_contacts = 0
+        return None
 
     if total_contacts == 0:
         print(colored("No contacts without company found.", "yellow"))
-        return
+        return 0
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_filename = f'extract/contacts_without_company_{timestamp}'
+    base_filename = f'{get_extract_dir()}/contacts_without_company_{timestamp}'
     
     file_index = 1
     total_processed = 0
@@ -466,9 +970,9 @@ def extract_contacts_without_company():
             }
             
             try:
-                response = requests.post(url, headers=headers, json=body)
+                response = api_request('POST', url, json=body)
                 response.raise_for_status()
-                data = response.json()
+                data = decode_json(response)
                 
                 contacts = data.get('results', [])
                 
@@ -508,7 +1012,7 @@ def extract_contacts_without_company():
                     logger.info(f"Retrying in 5 seconds... (Attempt {retry_count + 1}/3)")
                     time.sleep(5)
                     try:
-                        response = requests.post(url, headers=headers, json=body)
+                        response = api_request('POST', url, json=body)
                         response.raise_for_status()
                         break  # If successful, break out of the retry loop
                     except requests.exceptions.RequestException as retry_e:
@@ -524,26 +1028,22 @@ def extract_contacts_without_company():
         write_chunk_to_csv(current_chunk, all_fields, base_filename, file_index)
     
     print(colored(f"\nTotal contacts without company processed: {total_processed}", "green"))
+    return total_processed
 
 def write_chunk_to_csv(chunk, all_fields, base_filename, index):
     output_file = f'{base_filename}_{index}.csv'
     fieldnames = sorted(list(all_fields))
     
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for contact in chunk:
-            row = {"id": contact["id"]}
-            row.update(contact["properties"])
-            writer.writerow(row)
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(iter_csv_rows(chunk, fieldnames, "id"))
     
     print(colored(f"Saved {len(chunk)} contacts to {output_file}", "green"))
 
-def extract_companies_with_domains():
+def extract_companies_with_domains() -> Optional[int]:
     print(colored("Extracting all companies with their primary and additional domains...", "yellow"))
     
-    headers = {'Authorization': f'Bearer {TOKEN}', 'Content-Type': 'application/json'}
     url = f"{BASE_URL}/crm/v3/objects/companies/search"
     
     properties = ["name", "domain", "hs_additional_domains"]
@@ -564,21 +1064,21 @@ def extract_companies_with_domains():
     }
     
     try:
-        response = requests.post(url, headers=headers, json=initial_body)
+        response = api_request('POST', url, json=initial_body)
         response.raise_for_status()
-        data = response.json()
+        data = decode_json(response)
         total_companies = data.get('total', 0)
         print(colored(f"Estimated total companies with domains: {total_companies}", "green"))
     except requests.exceptions.RequestException as e:
         logger.error(f"Error estimating total companies: {str(e)}")
-        total_companies = 0
+        return None
 
     if total_companies == 0:
         print(colored("No companies with domains found.", "yellow"))
-        return
+        return 0
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    base_filename = f'extract/companies_with_domains_{timestamp}'
+    base_filename = f'{get_extract_dir()}/companies_with_domains_{timestamp}'
     
     file_index = 1
     total_processed = 0
@@ -610,9 +1110,9 @@ def extract_companies_with_domains():
             }
             
             try:
-                response = requests.post(url, headers=headers, json=body)
+                response = api_request('POST', url, json=body)
                 response.raise_for_status()
-                data = response.json()
+                data = decode_json(response)
                 
                 companies = data.get('results', [])
                 
@@ -652,7 +1152,7 @@ def extract_companies_with_domains():
                     logger.info(f"Retrying in 5 seconds... (Attempt {retry_count + 1}/3)")
                     time.sleep(5)
                     try:
-                        response = requests.post(url, headers=headers, json=body)
+                        response = api_request('POST', url, json=body)
                         response.raise_for_status()
                         break  # If successful, break out of the retry loop
                     except requests.exceptions.RequestException as retry_e:
@@ -668,15 +1168,94 @@ def extract_companies_with_domains():
         write_chunk_to_csv(current_chunk, all_fields, base_filename, file_index)
     
     print(colored(f"\nTotal companies processed: {total_processed}", "green"))
+    return total_processed
 
+def run_for_portal(portal: Portal, operation, *args) -> Dict:
+    """Run one operation with the given portal bound to the current worker thread.
+
+    Operations return None when they could not talk to HubSpot at all (e.g. invalid token).
+    """
+    _portal_context.portal = portal
+    os.makedirs(portal.extract_dir, exist_ok=True)
+    start = time.monotonic()
+    try:
+        result = operation(*args)
+        if result is None:
+            result, status, error = '', 'failed', "Could not fetch data from HubSpot, check the portal token and the log"
+        else:
+            status, error = 'success', ''
+    except Exception as e:
+        logger.error(f"Error processing portal {portal.name}: {str(e)}")
+        result, status, error = '', 'failed', str(e)
+    finally:
+        _portal_context.portal = None
+    return {
+        'Portal': portal.name,
+        'Status': status,
+        'Result': result,
+        'Duration (s)': round(time.monotonic() - start, 2),
+        'Concurrency': portal.concurrency.current_limit(),
+        'Error Message': error
+    }
+
+def run_multi_portal():
+    portal_tokens = load_portal_tokens()
+    if not portal_tokens:
+        logger.error(f"No portal tokens found. Add {PORTAL_TOKEN_PREFIX}<NAME>=... lines to your .env file.")
+        return
+
+    print(colored(f"Portals found: {', '.join(portal_tokens)}", "yellow"))
+    print(colored("Operation to run on every portal:", "yellow"))
+    print(colored("1. Extract fields (all objects)", "cyan"))
+    print(colored("2. Extract data sample (all objects)", "cyan"))
+    print(colored("3. Extract contacts without company", "cyan"))
+    print(colored("4. Extract companies with domains", "cyan"))
+
+    choice = get_user_input("Enter your choice:", ['1', '2', '3', '4'])
+    if choice == 'back':
+        return
+
+    # Prompts must happen before the workers start, they cannot share stdin
+    args = ()
+    if choice == '1':
+        operation = extract_all_objects_fields
+    elif choice == '2':
+        sample_type = select_sample_type()
+        if sample_type is None:
+            return
+        operation, args = extract_sample_data_all_objects, (sample_type,)
+    elif choice == '3':
+        operation = extract_contacts_without_company
+    else:
+        operation = extract_companies_with_domains
+
+    portals = [Portal(name, token) for name, token in portal_tokens.items()]
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(portals)) as executor:
+        futures = [executor.submit(run_for_portal, portal, operation, *args) for portal in portals]
+        summary = [future.result() for future in futures]
+    elapsed = time.monotonic() - start
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_file = os.path.join("extract", f"multi_portal_summary_{timestamp}.csv")
+    with open(summary_file, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ['Portal', 'Status', 'Result', 'Duration (s)', 'Concurrency', 'Error Message']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in summary:
+            writer.writerow(row)
+
+    succeeded = sum(1 for row in summary if row['Status'] == 'success')
+    print(colored(f"\nOperation completed on {succeeded}/{len(portals)} portals in {elapsed:.1f}s.", "green"))
+    print(colored(f"Summary saved in {summary_file}", "green"))
 
 def main():
-    for folder in ["extract", "delete", "errors"]:
+    for folder in ["extract", "delete", "hydrate", "errors"]:
         if not os.path.exists(folder):
             os.makedirs(folder)
             logger.info(f"Created '{folder}' folder")
 
-    if not TOKEN:
+    if not TOKEN and not load_portal_tokens():
         logger.error("HubSpot API key not found in .env file")
         print(colored("Please read the README and follow the process to set up your Hubspot API key.", "blue"))
         sys.exit(0)
@@ -688,17 +1267,26 @@ def main():
         print(colored("3. Delete records from a CSV file", "blue"))
         print(colored("4. Extract contacts without company", "blue"))
         print(colored("5. Extract companies with domains", "blue"))
-        print(colored("6. Exit", "blue"))
+        print(colored("6. Run on multiple portals", "blue"))
+        print(colored("7. Compare field snapshots", "blue"))
+        print(colored("8. Hydrate records from a CSV file", "blue"))
+        print(colored("9. Exit", "blue"))
+
+        action = get_user_input("Enter the number of the action you want to perform:", ['1', '2', '3', '4', '5', '6', '7', '8', '9'])
 
-        action = get_user_input("Enter the number of the action you want to perform:", ['1', '2', '3', '4', '5', '6'])
+        # Without HUBSPOT_TOKEN only the named portals (option 6) and local snapshots (option 7) can be used
+        if not TOKEN and action in ['1', '2', '3', '4', '5', '8']:
+            logger.error("HUBSPOT_TOKEN is not set in the .env file, this action needs it. Use option 6 for named portals.")
+            continue
 
         if action == '1':
+            objects = get_hubspot_objects()
+            if not objects:
+                continue
             print(colored("\nExtract fields for:", "yellow"))
             print(colored("1. All objects", "cyan"))
-            objects = get_hubspot_objects()
-            if objects:
-                for i, obj in enumerate(objects, 2):
-                    print(colored(f"{i}. {obj}", "cyan"))
+            for i, obj in enumerate(objects, 2):
+                print(colored(f"{i}. {obj}", "cyan"))
             
             object_choice = get_user_input("Enter your choice:", [str(i) for i in range(1, len(objects) + 2)])
             if object_choice == 'back':
@@ -709,17 +1297,19 @@ def main():
                 selected_object = objects[int(object_choice) - 2]
                 fields = get_object_fields(selected_object)
                 if fields:
-                    output_file = f'extract/{selected_object}_fields.csv'
-                    extract_fields_to_csv(selected_object, fields, output_file)
+                    index = load_snapshot_index(get_snapshot_dir())
+                    _, output_file = save_object_fields(selected_object, fields, index)
+                    save_snapshot_index(get_snapshot_dir(), index)
                     print(colored(f"Fields for {selected_object} saved in {output_file}", "green"))
 
         elif action == '2':
+            objects = get_hubspot_objects()
+            if not objects:
+                continue
             print(colored("\nExtract data sample for:", "yellow"))
             print(colored("1. All objects", "cyan"))
-            objects = get_hubspot_objects()
-            if objects:
-                for i, obj in enumerate(objects, 2):
-                    print(colored(f"{i}. {obj}", "cyan"))
+            for i, obj in enumerate(objects, 2):
+                print(colored(f"{i}. {obj}", "cyan"))
             
             object_choice = get_user_input("Enter your choice:", [str(i) for i in range(1, len(objects) + 2)])
             if object_choice == 'back':
@@ -737,6 +1327,19 @@ def main():
         elif action == '5':
             extract_companies_with_domains()
         elif action == '6':
+            run_multi_portal()
+        elif action == '7':
+            print(colored("\nCompare field snapshots:", "yellow"))
+            print(colored("1. Two snapshots of an object", "cyan"))
+            print(colored("2. Two portals", "cyan"))
+            compare_choice = get_user_input("Enter your choice:", ['1', '2'])
+            if compare_choice == '1':
+                compare_object_snapshots()
+            elif compare_choice == '2':
+                compare_portal_snapshots()
+        elif action == '8':
+            hydrate_records()
+        elif action == '9':
             print(colored("Exiting the program. Goodbye!", "green"))
             break
         else: